@@ -18,9 +18,15 @@ st.title("⚓ NaviCard AI Interactive Brief")
 # Layout: Left for Report, Right for Chat
 col1, col2 = st.columns([1.2, 1])
 
-# Load Report Data
-@st.cache_data
-def load_data():
+# Seconds between checks for newly published cards (main.py writes each card as it finishes)
+REFRESH_SECONDS = 10
+
+def file_mtime(path):
+    return os.path.getmtime(path) if os.path.exists(path) else 0
+
+# Load Report Data (cache keyed on mtime, so a rewritten report is picked up)
+@st.cache_data(max_entries=1)
+def load_data(mtime):
     if os.path.exists("daily_report.json"):
         with open("daily_report.json", "r", encoding="utf-8") as f:
             return json.load(f)
@@ -33,12 +39,17 @@ def load_html():
             return f.read()
     return "<h3>No Report Found. Please run main.py first.</h3>"
 
-report_data = load_data()
-html_content = load_html()
+report_data = load_data(file_mtime("daily_report.json"))
 
-with col1:
+@st.fragment(run_every=REFRESH_SECONDS)
+def report_panel():
+    # Re-runs on its own timer, so new cards appear without disturbing the chat
     st.subheader("Daily Report")
-    components.html(html_content, height=800, scrolling=True)
+    st.caption(f"{len(load_data(file_mtime('daily_report.json')))} cards")
+    components.html(load_html(), height=800, scrolling=True)
+
+with col1:
+    report_panel()
 
 with col2:
     st.subheader("🤖 Ask to AI (Naval Expert)")
@@ -70,7 +81,10 @@ with col2:
             for card in report_data:
                 context_text += f"---\nTitle: {card.get('headline_kr', 'No Title')}\n"
                 context_text += f"Deep Summary: {card.get('deep_summary_kr', '')}\n"
-                context_text += f"Technical Specs: {card.get('technical_specs_kr', '')}\n"
+                specs = card.get('technical_specs_kr', '')
+                if isinstance(specs, list):
+                    specs = "; ".join(specs)
+                context_text += f"Technical Specs: {specs}\n"
                 context_text += f"Strategic Insight: {card.get('strategic_insight_kr', '')}\n"
             
             # Call Gemini API
@@ -0,0 +1,92 @@
+
+import os
+import json
+import gzip
+from collections import OrderedDict
+
+# Configuration
+ARTICLE_STORE_DIR = os.getenv("ARTICLE_STORE_DIR", "article_store")
+# Per-month link sets kept in memory at once; older ones are dropped and reloaded on demand
+MAX_CACHED_MONTHS = int(os.getenv("ARTICLE_STORE_CACHED_MONTHS", "12"))
+
+class ArticleStore:
+    """
+    Append-only store of filtered (pre-summary) articles.
+
+    Articles are partitioned by publish month (article_store/2024-05.jsonl.gz,
+    one gzip member per write) and deduplicated by link within that month via
+    a per-month links file (article_store/2024-05.links). Only the link sets of
+    recently written months are held in memory, so a store covering years of
+    entries does not have to fit in RAM.
+    """
+
+    def __init__(self, root=ARTICLE_STORE_DIR, max_cached_months=MAX_CACHED_MONTHS):
+        self.root = root
+        self.max_cached_months = max_cached_months
+        self.month_links = OrderedDict()
+        os.makedirs(root, exist_ok=True)
+
+    def _links_path(self, month):
+        return os.path.join(self.root, f"{month}.links")
+
+    def _links_for(self, month):
+        """Link set of one month partition, loaded on first use (LRU-cached)."""
+        if month in self.month_links:
+            self.month_links.move_to_end(month)
+            return self.month_links[month]
+
+        links = set()
+        path = self._links_path(month)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                links = {line.rstrip("\n") for line in f if line.strip()}
+        self.month_links[month] = links
+        while len(self.month_links) > self.max_cached_months:
+            self.month_links.popitem(last=False)
+        return links
+
+    def add_many(self, articles):
+        """
+        Append articles not stored yet.
+
+        Returns:
+            int: Number of articles actually written.
+        """
+        partitions = {}
+        for article in articles:
+            link = article.get('link')
+            if not link:
+                continue
+            month = (article.get('published') or "unknown")[:7]
+            if month not in partitions:
+                partitions[month] = (self._links_for(month), [], [])
+            links, lines, new_links = partitions[month]
+            if link in links:
+                continue
+            links.add(link)
+            new_links.append(link)
+            lines.append(json.dumps(article, ensure_ascii=False, separators=(",", ":")))
+
+        written = 0
+        for month, (_, lines, new_links) in partitions.items():
+            if not lines:
+                continue
+            with gzip.open(os.path.join(self.root, f"{month}.jsonl.gz"), "at", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+            # Links last: a crash in between can at worst duplicate an article on
+            # the next write, never record a link whose article was lost
+            with open(self._links_path(month), "a", encoding="utf-8") as f:
+                f.write("\n".join(new_links) + "\n")
+            written += len(new_links)
+        return written
+
+    def iter_articles(self, month=None):
+        """Yield stored articles, optionally only those of one 'YYYY-MM' partition."""
+        names = sorted(n for n in os.listdir(self.root) if n.endswith(".jsonl.gz"))
+        for name in names:
+            if month and not name.startswith(month):
+                continue
+            with gzip.open(os.path.join(self.root, name), "rt", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
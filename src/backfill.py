@@ -0,0 +1,144 @@
+
+import os
+import sys
+import time
+import gzip
+import argparse
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import feedparser
+import requests
+
+from feed_parser import HEADERS, entry_to_candidate, filter_candidates
+from article_store import ArticleStore
+
+# Configuration
+ARCHIVE_EXTENSIONS = (".xml", ".rss", ".atom", ".xml.gz", ".rss.gz", ".atom.gz")
+DEFAULT_CHUNK_SIZE = 8
+
+def read_opml(path):
+    """Return the feed URLs (xmlUrl attributes) listed in an OPML file, nested outlines included."""
+    tree = ET.parse(path)
+    return [
+        outline.get('xmlUrl') for outline in tree.iter('outline')
+        if outline.get('xmlUrl')
+    ]
+
+def find_archives(path):
+    """Return archived feed files under path (a single file or a directory tree)."""
+    if os.path.isfile(path):
+        return [path]
+    found = []
+    for dirpath, _, filenames in os.walk(path):
+        for name in sorted(filenames):
+            if name.lower().endswith(ARCHIVE_EXTENSIONS):
+                found.append(os.path.join(dirpath, name))
+    return found
+
+def _load_source(source):
+    """Raw feed bytes for a URL or local (optionally gzipped) archive file."""
+    if source.startswith(("http://", "https://")):
+        response = requests.get(source, headers=HEADERS, timeout=30)
+        response.raise_for_status()
+        return response.content
+    with open(source, "rb") as f:
+        data = f.read()
+    return gzip.decompress(data) if source.endswith(".gz") else data
+
+def process_chunk(sources):
+    """
+    Worker: parse a chunk of feeds and apply the keyword/semantic filters.
+    No recency window is applied, since backfill is about history.
+
+    Returns:
+        tuple: (entries_seen, matching_articles, errors)
+    """
+    entries_seen = 0
+    articles = []
+    errors = []
+    for source in sources:
+        try:
+            feed = feedparser.parse(_load_source(source))
+            source_name = feed.feed.get('title', source)
+            candidates = [entry_to_candidate(entry, source_name) for entry in feed.entries]
+            entries_seen += len(candidates)
+            articles.extend(a for a in filter_candidates(candidates) if a['link'])
+        except Exception as e:
+            errors.append(f"{source}: {e}")
+    return entries_seen, articles, errors
+
+def backfill(sources, store, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Process sources across a process pool and stream matches into store.
+
+    At most 2 chunks per worker are in flight, and the store keeps dedup links
+    for at most ARTICLE_STORE_CACHED_MONTHS months, so memory is bounded by the
+    chunk size and that window rather than by the number of sources or the
+    size of the store.
+
+    Returns:
+        dict: Totals and throughput figures.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = (sources[i:i + chunk_size] for i in range(0, len(sources), chunk_size))
+    totals = {"sources": len(sources), "entries": 0, "matched": 0, "stored": 0, "errors": 0}
+
+    print(f"[Backfill] {len(sources)} sources, {workers} workers, chunks of {chunk_size}")
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for chunk in chunks:
+            pending.add(executor.submit(process_chunk, chunk))
+            if len(pending) < workers * 2:
+                continue
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            _collect(done, store, totals)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            _collect(done, store, totals)
+
+    elapsed = time.perf_counter() - start
+    totals["seconds"] = elapsed
+    totals["entries_per_sec"] = totals["entries"] / elapsed if elapsed else 0.0
+    totals["entries_per_sec_per_core"] = totals["entries_per_sec"] / workers
+    print(f"[Backfill] Done in {elapsed:.1f}s: {totals['entries']} entries, {totals['matched']} matched, "
+          f"{totals['stored']} new, {totals['errors']} errors")
+    print(f"[Backfill] Throughput: {totals['entries_per_sec']:.0f} entries/sec "
+          f"({totals['entries_per_sec_per_core']:.0f} entries/sec per core)")
+    return totals
+
+def _collect(done, store, totals):
+    for future in done:
+        entries_seen, articles, errors = future.result()
+        totals["entries"] += entries_seen
+        totals["matched"] += len(articles)
+        totals["stored"] += store.add_many(articles)
+        totals["errors"] += len(errors)
+        for error in errors:
+            print(f"[Backfill] Error: {error}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backfill the article store from OPML lists and archived feeds.")
+    parser.add_argument("--opml", action="append", default=[], help="OPML file whose feeds are fetched (repeatable)")
+    parser.add_argument("--archive", action="append", default=[], help="Archived feed file or directory (repeatable)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Sources per worker task")
+    args = parser.parse_args(argv)
+
+    sources = []
+    for path in args.opml:
+        urls = read_opml(path)
+        print(f"[Backfill] {path}: {len(urls)} feeds")
+        sources.extend(urls)
+    for path in args.archive:
+        files = find_archives(path)
+        print(f"[Backfill] {path}: {len(files)} archive files")
+        sources.extend(files)
+
+    if not sources:
+        parser.error("nothing to backfill; pass --opml and/or --archive")
+
+    backfill(sources, ArticleStore(), workers=args.workers, chunk_size=args.chunk_size)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
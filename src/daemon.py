@@ -0,0 +1,217 @@
+
+import os
+import time
+import calendar
+from collections import deque
+from datetime import datetime, timedelta
+import requests
+from dotenv import load_dotenv
+
+from feed_parser import FEED_URLS, fetch_feed, extract_articles
+from triage import RelevanceTriage
+from summarizer import NewsSummarizer
+from image_generator import ImageGenerator
+from image_cache import ImageLibrary
+from main import process_article, write_report, publish_report
+
+# Load environment variables
+load_dotenv()
+
+# Configuration
+MIN_POLL_SECONDS = int(os.getenv("DAEMON_MIN_POLL_SECONDS", "300"))
+MAX_POLL_SECONDS = int(os.getenv("DAEMON_MAX_POLL_SECONDS", "7200"))
+# Minimum spacing between two articles going through summarizer + image generation
+API_INTERVAL_SECONDS = int(os.getenv("DAEMON_API_INTERVAL_SECONDS", "300"))
+MAX_CARDS_PER_DIGEST = int(os.getenv("DAEMON_MAX_CARDS_PER_DIGEST", "10"))
+DIGEST_TIME = os.getenv("DIGEST_TIME", "07:00")
+# Queued articles older than this are dropped at digest time; the queue is also capped
+QUEUE_MAX_AGE_HOURS = 24
+MAX_QUEUE_SIZE = MAX_CARDS_PER_DIGEST * 5
+# Links are remembered this long; is_recent() ignores anything older anyway
+SEEN_LINK_HOURS = 48
+IDLE_SLEEP_SECONDS = 30
+
+class FeedPoller:
+    """
+    Polls a single feed on an interval learned from its publish rate.
+
+    The interval is half the median gap between the feed's recent entries,
+    clamped to [MIN_POLL_SECONDS, MAX_POLL_SECONDS]. Polls that bring nothing
+    new (HTTP 304 or no unseen entries) back off by 1.5x until the feed moves.
+    """
+
+    def __init__(self, url):
+        self.url = url
+        self.interval = MIN_POLL_SECONDS
+        self.next_poll = 0.0
+        self.etag = None
+        self.modified = None
+
+    def _learned_interval(self, feed):
+        stamps = sorted(
+            calendar.timegm(entry.published_parsed)
+            for entry in feed.entries if entry.get('published_parsed')
+        )[-20:]
+        gaps = sorted(b - a for a, b in zip(stamps, stamps[1:]) if b > a)
+        if not gaps:
+            return self.interval
+        median_gap = gaps[len(gaps) // 2]
+        return max(MIN_POLL_SECONDS, min(MAX_POLL_SECONDS, median_gap / 2))
+
+    def poll(self, session, seen_links):
+        """Fetch the feed and return newly matching articles."""
+        articles = []
+        try:
+            feed, response = fetch_feed(self.url, session, self.etag, self.modified)
+            if feed is not None:
+                self.etag = response.headers.get('ETag')
+                self.modified = response.headers.get('Last-Modified')
+                articles, unseen = extract_articles(feed, seen_links)
+                # Back off on the publish rate, not the match rate: a feed that posts
+                # often but rarely matches must still be polled at its learned pace
+                if unseen:
+                    self.interval = self._learned_interval(feed)
+                else:
+                    self.interval = min(MAX_POLL_SECONDS, max(self.interval * 1.5, self._learned_interval(feed)))
+            else:
+                self.interval = min(MAX_POLL_SECONDS, self.interval * 1.5)
+        except Exception as e:
+            print(f"[Daemon] Error polling {self.url}: {e}")
+            self.interval = min(MAX_POLL_SECONDS, self.interval * 1.5)
+
+        self.next_poll = time.time() + self.interval
+        print(f"[Daemon] {self.url}: {len(articles)} new, next poll in {self.interval / 60:.0f} min")
+        return articles
+
+class NaviCardDaemon:
+    """
+    Service mode: keeps HTTP sessions, the image library and dedup state in
+    memory, processes new articles one at a time as they arrive, and sends the
+    accumulated cards as a digest at DIGEST_TIME every day.
+    """
+
+    def __init__(self):
+        self.session = requests.Session()
+        self.pollers = [FeedPoller(url) for url in FEED_URLS]
+        self.seen_links = set()
+        self.seen_at = {}
+        # Poll results wait here so triage sees batches rather than one feed's 1-2 articles
+        self.untriaged = []
+        # Bounded: when full, the oldest queued article falls off
+        self.queue = deque(maxlen=MAX_QUEUE_SIZE)
+        self.cards = []
+
+        self.triage = RelevanceTriage()
+        self.summarizer = NewsSummarizer()
+        self.image_gen = ImageGenerator()
+        self.image_library = ImageLibrary()
+        self.next_api_time = 0.0
+
+        hour, minute = (int(x) for x in DIGEST_TIME.split(":"))
+        self.digest_hour, self.digest_minute = hour, minute
+        self.next_digest = self._next_digest_after(datetime.now())
+
+    def _next_digest_after(self, now):
+        digest = now.replace(hour=self.digest_hour, minute=self.digest_minute, second=0, microsecond=0)
+        if digest <= now:
+            digest += timedelta(days=1)
+        return digest
+
+    def _poll_due_feeds(self):
+        now = time.time()
+        for poller in self.pollers:
+            if poller.next_poll <= now:
+                self.untriaged.extend(poller.poll(self.session, self.seen_links))
+        for link in self.seen_links:
+            self.seen_at.setdefault(link, now)
+
+    def _processor_idle(self):
+        return not self.queue and time.time() >= self.next_api_time and len(self.cards) < MAX_CARDS_PER_DIGEST
+
+    def _triage_pending(self):
+        """
+        Triage the untriaged articles in one pass (one request per TRIAGE_BATCH_SIZE).
+        Runs once a full batch has built up, or earlier when the processor would
+        otherwise sit idle waiting for an article.
+        """
+        if not self.untriaged:
+            return
+        if len(self.untriaged) < self.triage.batch_size and not self._processor_idle():
+            return
+        pending, self.untriaged = self.untriaged, []
+        self.queue.extend(self.triage.filter(pending))
+
+    def _expire_state(self):
+        """Drop stale queued articles and forget links outside the recency window."""
+        now = datetime.now()
+        cutoff = (now - timedelta(hours=QUEUE_MAX_AGE_HOURS)).strftime('%Y-%m-%d %H:%M:%S')
+        before = len(self.queue) + len(self.untriaged)
+        self.queue = deque((a for a in self.queue if a['published'] >= cutoff), maxlen=MAX_QUEUE_SIZE)
+        self.untriaged = [a for a in self.untriaged if a['published'] >= cutoff]
+
+        link_cutoff = time.time() - SEEN_LINK_HOURS * 3600
+        stale = [link for link, seen in self.seen_at.items() if seen < link_cutoff]
+        for link in stale:
+            del self.seen_at[link]
+            self.seen_links.discard(link)
+        print(f"[Daemon] Expired {before - len(self.queue) - len(self.untriaged)} queued articles and {len(stale)} seen links.")
+
+    def _process_next(self):
+        if not self.queue or time.time() < self.next_api_time:
+            return
+        if len(self.cards) >= MAX_CARDS_PER_DIGEST:
+            return
+
+        article = self.queue.popleft()
+        card = process_article(article, self.summarizer, self.image_gen, self.image_library)
+        if card:
+            self.cards.append(card)
+            # Dashboard sees each card right away; the digest email waits for DIGEST_TIME
+            write_report(self.cards)
+            print(f"[Daemon] {len(self.cards)}/{MAX_CARDS_PER_DIGEST} cards ready for the next digest")
+        self.next_api_time = time.time() + API_INTERVAL_SECONDS
+
+    def _send_digest(self):
+        print(f"[Daemon] Digest time. {len(self.cards)} cards collected, "
+              f"{len(self.queue)} still queued, {len(self.untriaged)} awaiting triage.")
+        self.triage.report()
+        self.summarizer.report()
+        self.image_library.report()
+        if self.cards:
+            publish_report(self.cards)
+        else:
+            print("[!] No cards generated. Skipping digest.")
+        self.cards = []
+        self._expire_state()
+        self.triage.new_run()
+        self.summarizer.new_run()
+        self.image_library.new_run()
+        self.next_digest = self._next_digest_after(datetime.now())
+
+    def _seconds_until_next_event(self):
+        now = time.time()
+        events = [poller.next_poll for poller in self.pollers]
+        events.append(self.next_digest.timestamp())
+        if (self.queue or self.untriaged) and len(self.cards) < MAX_CARDS_PER_DIGEST:
+            events.append(self.next_api_time)
+        return max(1.0, min(IDLE_SLEEP_SECONDS, min(events) - now))
+
+    def run(self):
+        print(f"=== NaviCard AI Daemon Started (digest at {DIGEST_TIME}, next {self.next_digest:%Y-%m-%d %H:%M}) ===")
+        try:
+            while True:
+                # One failing iteration (bad API body, disk error...) must not stop the service
+                try:
+                    self._poll_due_feeds()
+                    self._triage_pending()
+                    self._process_next()
+                    if datetime.now() >= self.next_digest:
+                        self._send_digest()
+                except Exception as e:
+                    print(f"[Daemon] Error in service loop: {e}")
+                time.sleep(self._seconds_until_next_event())
+        except KeyboardInterrupt:
+            print("=== NaviCard AI Daemon Stopped ===")
+
+if __name__ == "__main__":
+    NaviCardDaemon().run()
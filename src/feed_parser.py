@@ -8,6 +8,8 @@ from bs4 import BeautifulSoup
 import re
 import os
 
+from semantic_filter import get_semantic_filter, blend_scores, BLEND_THRESHOLD
+
 # Configuration
 FEED_URLS = [
     "https://www.navalnews.com/feed/",
@@ -16,6 +18,10 @@ FEED_URLS = [
     "https://www.janes.com/feed",
 ]
 
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
 # Keywords for High-Valued Technical Content (Ship Control & Platforms)
 TARGET_KEYWORDS = [
     r"USV", r"Unmanned Surface", r"Autonomous Navigation", 
@@ -31,6 +37,11 @@ EXCLUDE_KEYWORDS = [
     r"Bullet", r"Warhead", r"Strike Fighter", r"Aircraft"
 ]
 
+# Subset of TARGET_KEYWORDS that name a platform (used for trend reporting)
+PLATFORM_KEYWORDS = [
+    r"USV", r"Frigate", r"Destroyer", r"Submarine", r"Corvette"
+]
+
 def is_recent(published_parsed, hours=24):
     """Check if the article was published within the last N hours."""
     if not published_parsed:
@@ -51,6 +62,14 @@ def contains_keywords(text, keywords):
             return True
     return False
 
+def matched_keywords(text, keywords):
+    """Return the keywords found in text (case-insensitive), in declaration order."""
+    if not text:
+        return []
+
+    text_lower = text.lower()
+    return [kw for kw in keywords if re.search(kw.lower(), text_lower)]
+
 def contains_exclude_keywords(text, exclude_keywords):
     """Check if text contains exclude keywords BUT NOT target keywords."""
     # If the article talks about "Missile integration with IPMS", we want it.
@@ -73,86 +92,164 @@ def clean_html(html_content):
     soup = BeautifulSoup(html_content, 'html.parser')
     return soup.get_text().strip()
 
+def fetch_feed(url, session=None, etag=None, modified=None):
+    """
+    Fetch and parse one feed.
+
+    Args:
+        url (str): Feed URL.
+        session (requests.Session): Optional session to reuse connections.
+        etag, modified (str): Validators from a previous fetch for a conditional GET.
+
+    Returns:
+        tuple: (feed, response). feed is None when the fetch failed or the feed
+        is unchanged (HTTP 304).
+    """
+    headers = dict(HEADERS)
+    if etag:
+        headers['If-None-Match'] = etag
+    if modified:
+        headers['If-Modified-Since'] = modified
+
+    # Use requests to fetch first
+    response = (session or requests).get(url, headers=headers, timeout=10)
+    if response.status_code == 304:
+        return None, response
+    if response.status_code != 200:
+        print(f"Failed to fetch {url}: Status {response.status_code}")
+        return None, response
+
+    return feedparser.parse(response.content), response
+
+def entry_to_candidate(entry, source):
+    """Extract text and keyword matches from a feed entry, before any filtering."""
+    # 3. Content Extraction
+    title = entry.get('title', '')
+    summary = clean_html(entry.get('summary', '') or entry.get('description', ''))
+    content = ""
+    if 'content' in entry:
+        content = clean_html(entry['content'][0].value)
+    
+    full_text = f"{title} {summary} {content}"
+
+    # 4. Keyword Filtering
+    matched = matched_keywords(full_text, TARGET_KEYWORDS)
+    is_excluded = contains_exclude_keywords(full_text, EXCLUDE_KEYWORDS)
+
+    return {
+        'title': title,
+        'link': entry.get('link'),
+        'published': time.strftime('%Y-%m-%d %H:%M:%S', entry.published_parsed) if entry.get('published_parsed') else datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'source': source,
+        'summary': summary,
+        'matched_keywords': matched,
+        '_excluded': is_excluded,
+        '_text': full_text
+    }
+
+def keyword_pass(candidate):
+    """True if the candidate has a target keyword and no exclude keyword."""
+    # Logic: Must have Target Keyword.
+    # If it has Exclude Keyword, it is discarded UNLESS it is specifically about control/platform?
+    # User request: "Exclude weapons scope, focus on ship/USV/Control".
+    # Simplest approach: If it has Exclude keyword, drop it, unless we really trust Target keywords.
+    # Let's try: If it contains Exclude Keyword, we drop it regardless (strict filter for now given 'Scope Change' note).
+    return bool(candidate['matched_keywords']) and not candidate['_excluded']
+
+def _strip_private(candidate):
+    return {k: v for k, v in candidate.items() if not k.startswith('_')}
+
+def filter_candidates(candidates):
+    """
+    Keep candidates passing the keyword filter blended with the semantic filter.
+
+    All candidates are scored by the semantic filter in one batch. Without
+    numpy (or with SEMANTIC_BLEND=0) this is the plain keyword filter.
+    EXCLUDE_KEYWORDS stay a hard veto after blending: a high semantic score
+    never brings back a weapons article.
+    """
+    if not candidates:
+        return []
+
+    keyword_flags = [keyword_pass(c) for c in candidates]
+    semantic = get_semantic_filter()
+    if semantic is None:
+        return [_strip_private(c) for c, ok in zip(candidates, keyword_flags) if ok]
+
+    semantic_scores = semantic.score([c['_text'] for c in candidates])
+    combined = blend_scores(keyword_flags, semantic_scores)
+    articles = []
+    for candidate, score, semantic_score in zip(candidates, combined, semantic_scores):
+        if score < BLEND_THRESHOLD or candidate['_excluded']:
+            continue
+        article = _strip_private(candidate)
+        article['semantic_score'] = round(float(semantic_score), 3)
+        articles.append(article)
+    return articles
+
+def extract_candidates(feed, seen_links):
+    """Apply the recency and dedup filters to a parsed feed. Returns unfiltered candidates."""
+    candidates = []
+    source = feed.feed.get('title', 'Unknown Source')
+    for entry in feed.entries:
+        # 1. Check Recency
+        if not is_recent(entry.get('published_parsed')):
+            # print(f"    Skip (Old): {entry.get('title')}")
+            continue
+        
+        # 2. Deduplication
+        link = entry.get('link')
+        if link in seen_links:
+            continue
+        seen_links.add(link)
+
+        candidates.append(entry_to_candidate(entry, source))
+
+    return candidates
+
+def _print_matches(articles):
+    for article in articles:
+        tag = "" if article['matched_keywords'] else " (semantic)"
+        print(f"  [+] Match{tag}: {article['title']}")
+
+def extract_articles(feed, seen_links):
+    """
+    Apply the recency, dedup and relevance filters to a parsed feed.
+
+    Returns:
+        tuple: (matching articles, number of unseen recent entries before the relevance filter)
+    """
+    candidates = extract_candidates(feed, seen_links)
+    articles = filter_candidates(candidates)
+    _print_matches(articles)
+    return articles, len(candidates)
+
 def collect_news():
     print(f"[*] Starting news collection from {len(FEED_URLS)} feeds...")
-    collected_articles = []
+    candidates = []
     seen_links = set()
 
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-
     for url in FEED_URLS:
         try:
             print(f"Processing: {url}")
-            # Use requests to fetch first
-            response = requests.get(url, headers=headers, timeout=10)
-            if response.status_code != 200:
-                print(f"Failed to fetch {url}: Status {response.status_code}")
+            feed, _ = fetch_feed(url)
+            if feed is None:
                 continue
-                
-            feed = feedparser.parse(response.content)
             
             if not feed.entries:
                 print(f"  -> No entries found in {url}")
                 continue
             
             print(f"  -> Found {len(feed.entries)} entries. Filtering...")
-
-            for entry in feed.entries:
-                # 1. Check Recency
-                if not is_recent(entry.get('published_parsed')):
-                    # print(f"    Skip (Old): {entry.get('title')}")
-                    continue
-                
-                # 2. Deduplication
-                link = entry.get('link')
-                if link in seen_links:
-                    continue
-                seen_links.add(link)
-
-                # 3. Content Extraction
-                title = entry.get('title', '')
-                summary = clean_html(entry.get('summary', '') or entry.get('description', ''))
-                content = ""
-                if 'content' in entry:
-                    content = clean_html(entry['content'][0].value)
-                
-                full_text = f"{title} {summary} {content}"
-
-                # 4. Keyword Filtering
-                is_target = contains_keywords(full_text, TARGET_KEYWORDS)
-                is_excluded = contains_exclude_keywords(full_text, EXCLUDE_KEYWORDS)
-                
-                # Logic: Must have Target Keyword.
-                # If it has Exclude Keyword, it is discarded UNLESS it is specifically about control/platform?
-                # User request: "Exclude weapons scope, focus on ship/USV/Control".
-                # Simplest approach: If it has Exclude keyword, drop it, unless we really trust Target keywords.
-                # Let's try: If it contains Exclude Keyword, we drop it regardless (strict filter for now given 'Scope Change' note).
-                
-                if not is_target:
-                    # print(f"    Skip (No Target KW): {title}")
-                    continue
-
-                if is_excluded:
-                     # Check if it ALSO strongly matches Platform Control to save it?
-                     # For now, strict exclusion to satisfy "Exclude weapons".
-                     # print(f"    Skip (Excluded Topic): {title}")
-                     continue
-
-                print(f"  [+] Match: {title}")
-                article_data = {
-                    'title': title,
-                    'link': link,
-                    'published': time.strftime('%Y-%m-%d %H:%M:%S', entry.published_parsed) if entry.get('published_parsed') else datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                    'source': feed.feed.get('title', 'Unknown Source'),
-                    'summary': summary
-                }
-                collected_articles.append(article_data)
+            candidates.extend(extract_candidates(feed, seen_links))
                 
         except Exception as e:
             print(f"Error parsing {url}: {e}")
 
+    # Relevance filtering runs once over all feeds so the semantic scoring is a single batch
+    collected_articles = filter_candidates(candidates)
+    _print_matches(collected_articles)
+
     print(f"[*] Collection complete. Found {len(collected_articles)} relevant articles.")
     return collected_articles
 
@@ -0,0 +1,202 @@
+
+import os
+import re
+import json
+import time
+from datetime import datetime
+
+from feed_parser import PLATFORM_KEYWORDS
+
+# Configuration
+LIBRARY_PATH = os.getenv("IMAGE_LIBRARY_PATH", "images/library.json")
+# "reuse": serve similar images from the library, "fallback": only use the library
+# when generation fails, "off": always call the API
+REUSE_MODE = os.getenv("IMAGE_REUSE_MODE", "reuse")
+# Short prompts make Jaccard coarse: {modern, sea, frigate} vs {modern, sea, submarine} is 0.5
+REUSE_THRESHOLD = float(os.getenv("IMAGE_REUSE_THRESHOLD", "0.6"))
+# Minimum similarity for a library image to stand in when generation fails; below it the card gets the placeholder
+FALLBACK_THRESHOLD = float(os.getenv("IMAGE_FALLBACK_THRESHOLD", str(REUSE_THRESHOLD / 2)))
+MAX_REUSES = int(os.getenv("IMAGE_REUSE_MAX", "10"))
+
+# Words that carry style rather than subject; every summarizer prompt has them
+STOPWORDS = {
+    "a", "an", "the", "of", "at", "in", "on", "with", "and", "or", "to", "for", "by",
+    "from", "its", "is", "as", "into", "over", "under", "through", "while",
+    "cinematic", "shot", "wide", "angle", "view", "golden", "hour", "lighting", "light",
+    "dramatic", "atmosphere", "atmospheric", "realistic", "realism", "technical",
+    "photorealistic", "high", "end", "detailed", "detail", "vivid", "style", "image",
+    "4k", "8k", "hd", "ultra", "sharp", "focus", "depth", "field", "scene", "background",
+}
+
+# Subjects an image must agree on before it can stand in for another, as signature
+# token sets (any one set present names the platform)
+PLATFORM_TERMS = {kw.lower(): [{kw.lower()}] for kw in PLATFORM_KEYWORDS}
+PLATFORM_TERMS["usv"] = [{"usv"}, {"unmanned", "surface"}, {"uncrewed", "surface"}]
+PLATFORM_TERMS["vessel"] = [{"vessel"}]
+PLATFORM_TERMS["control room"] = [{"control", "room"}]
+
+def prompt_signature(prompt):
+    """Normalized keyword signature of an image prompt: lowercase subject tokens, plural 's' stripped."""
+    tokens = set()
+    for word in re.findall(r"[a-z0-9]+", (prompt or "").lower()):
+        if word in STOPWORDS or len(word) < 2:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.add(word)
+    return tokens
+
+def platforms(signature):
+    """Platforms named by a signature. A generic "vessel" only counts when nothing more specific is named."""
+    named = {name for name, term_sets in PLATFORM_TERMS.items() if any(terms <= signature for terms in term_sets)}
+    if len(named) > 1:
+        named.discard("vessel")
+    return named
+
+def similarity(sig_a, sig_b):
+    """Jaccard similarity of two signatures; 0 when they name different platforms."""
+    if not sig_a or not sig_b:
+        return 0.0
+    if platforms(sig_a) != platforms(sig_b):
+        return 0.0
+    return len(sig_a & sig_b) / len(sig_a | sig_b)
+
+class ImageLibrary:
+    """
+    Local library of generated images indexed by prompt signature.
+
+    Before calling the image API, a new prompt is compared against every stored
+    prompt; above the similarity threshold the stored image is reused instead.
+    Prompts naming different platforms (frigate vs submarine...) never match.
+    An image is not handed out twice in the same run, so a digest never shows
+    duplicate pictures.
+    """
+
+    def __init__(self, path=LIBRARY_PATH, mode=REUSE_MODE, threshold=REUSE_THRESHOLD, max_reuses=MAX_REUSES,
+                 fallback_threshold=FALLBACK_THRESHOLD):
+        self.path = path
+        self.mode = mode
+        self.threshold = threshold
+        self.fallback_threshold = fallback_threshold
+        self.max_reuses = max_reuses
+        self.entries = self._load()
+        self.used_this_run = set()
+        self.stats = {"hits": 0, "misses": 0, "fallbacks": 0, "api_calls": 0, "api_seconds": 0.0}
+
+    def _load(self):
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    entries = json.load(f)
+                for entry in entries:
+                    entry['signature'] = set(entry['signature'])
+                return entries
+            except (OSError, ValueError, KeyError) as e:
+                print(f"[ImageCache] Failed to load library, starting empty: {e}")
+        return []
+
+    def _save(self):
+        dirname = os.path.dirname(self.path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        serializable = [dict(entry, signature=sorted(entry['signature'])) for entry in self.entries]
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(serializable, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
+
+    def _best_match(self, prompt):
+        """Return (entry, score) of the most similar usable image, or (None, 0.0)."""
+        signature = prompt_signature(prompt)
+        best, best_score = None, 0.0
+        for entry in self.entries:
+            if entry['path'] in self.used_this_run:
+                continue
+            if entry.get('uses', 0) >= self.max_reuses:
+                continue
+            if not os.path.exists(entry['path']):
+                continue
+            score = similarity(signature, entry['signature'])
+            if score > best_score:
+                best, best_score = entry, score
+        return best, best_score
+
+    def _take(self, entry):
+        entry['uses'] = entry.get('uses', 0) + 1
+        self.used_this_run.add(entry['path'])
+        self._save()
+        return entry['path']
+
+    def add(self, prompt, path):
+        """
+        Register a freshly generated image.
+
+        Returns:
+            bool: False if the path is already in the library (it would alias
+            another entry's image), True otherwise.
+        """
+        if any(entry['path'] == path for entry in self.entries):
+            print(f"[ImageCache] {path} is already in the library. Not registering it again.")
+            return False
+        self.entries.append({
+            'prompt': prompt,
+            'signature': prompt_signature(prompt),
+            'path': path,
+            'uses': 0,
+            'created': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        })
+        self.used_this_run.add(path)
+        self._save()
+        return True
+
+    def get_or_generate(self, prompt, output_path, image_gen):
+        """
+        Return an image path for prompt, reusing a library image when allowed.
+
+        Args:
+            prompt (str): Image prompt from the summarizer.
+            output_path (str): Where a newly generated image should be saved.
+            image_gen (ImageGenerator): Used on a cache miss.
+
+        Returns:
+            str: Image path (or URL), or None if nothing could be produced.
+        """
+        if self.mode == "reuse":
+            entry, score = self._best_match(prompt)
+            if entry and score >= self.threshold:
+                self.stats["hits"] += 1
+                print(f"    [ImageCache] Reusing {entry['path']} (similarity {score:.2f})")
+                return self._take(entry)
+
+        self.stats["misses"] += 1
+        self.stats["api_calls"] += 1
+        start = time.perf_counter()
+        generated = image_gen.generate_image(prompt, output_path)
+        self.stats["api_seconds"] += time.perf_counter() - start
+        if generated:
+            if not generated.startswith("http"):
+                self.add(prompt, generated)
+            return generated
+
+        # Generation failed: better a related picture than a placeholder, but not an unrelated one
+        if self.mode != "off":
+            entry, score = self._best_match(prompt)
+            if entry and score >= self.fallback_threshold:
+                self.stats["fallbacks"] += 1
+                print(f"    [ImageCache] Generation failed, falling back to {entry['path']} (similarity {score:.2f})")
+                return self._take(entry)
+        return None
+
+    def new_run(self):
+        """Reset per-run state (duplicate guard and statistics), e.g. after a daemon digest."""
+        self.used_this_run = set()
+        self.stats = {"hits": 0, "misses": 0, "fallbacks": 0, "api_calls": 0, "api_seconds": 0.0}
+
+    def report(self):
+        """Print hit-rate statistics for this run."""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        hit_rate = (self.stats["hits"] / lookups * 100) if lookups else 0.0
+        print(f"[ImageCache] {self.stats['hits']}/{lookups} reused ({hit_rate:.0f}% hit rate), "
+              f"{self.stats['api_calls']} API calls ({self.stats['api_seconds']:.1f}s), {self.stats['fallbacks']} fallbacks, "
+              f"{len(self.entries)} images in library")
+        return dict(self.stats, hit_rate=hit_rate)
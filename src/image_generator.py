@@ -8,6 +8,8 @@ class ImageGenerator:
         self.api_key = os.getenv("GEMINI_API_KEY")
         # User confirmed model: gemini-2.5-flash-image
         self.model_name = "gemini-2.5-flash-image"
+        # Keep-alive session so repeated calls reuse the TLS connection
+        self.session = requests.Session()
 
     def generate_image(self, prompt, output_path):
         """
@@ -38,7 +40,7 @@ class ImageGenerator:
         try:
             # Simple retry logic for rate limits
             for attempt in range(1, 4):
-                response = requests.post(url, headers=headers, json=data)
+                response = self.session.post(url, headers=headers, json=data)
                 
                 if response.status_code == 429:
                     print(f"[ImageGen] Rate limit hit. Waiting 60s... (Attempt {attempt})")
@@ -0,0 +1,95 @@
+
+import re
+import json
+
+# How many trailing elements repair_json may drop when closing brackets alone is not enough
+MAX_CUTBACKS = 10
+
+def _scan(text):
+    """
+    Walk text tracking JSON strings and nesting.
+
+    Returns:
+        tuple: (closers, in_string, comma_positions) where closers are the
+        brackets still open at the end, innermost last.
+    """
+    closers = []
+    commas = []
+    in_string = False
+    escaped = False
+    for i, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch == "{":
+            closers.append("}")
+        elif ch == "[":
+            closers.append("]")
+        elif ch in "}]" and closers:
+            closers.pop()
+        elif ch == ",":
+            commas.append(i)
+    return closers, in_string, commas
+
+def _close(text):
+    """Terminate an open string, drop a dangling comma/colon and close every open bracket."""
+    closers, in_string, _ = _scan(text)
+    if in_string:
+        if text.endswith("\\"):
+            text = text[:-1]
+        text += '"'
+    text = text.rstrip()
+    if text.endswith(","):
+        text = text[:-1]
+    elif text.endswith(":"):
+        text += " null"
+    return text + "".join(reversed(closers))
+
+def repair_json(text):
+    """
+    Best-effort parse of model output that should be JSON.
+
+    Handles markdown code fences, leading/trailing prose, and output truncated
+    mid-string or mid-object (e.g. by the token limit). When closing the open
+    brackets does not yield valid JSON, the last incomplete element is dropped
+    and closing is retried.
+
+    Returns:
+        tuple: (value, repaired). value is None if nothing could be recovered;
+        repaired is True when anything beyond a plain json.loads was needed.
+    """
+    if not text:
+        return None, False
+    try:
+        return json.loads(text), False
+    except ValueError:
+        pass
+
+    text = re.sub(r"^\s*```[a-zA-Z]*\s*|\s*```\s*$", "", text)
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    if not starts:
+        return None, True
+    text = text[min(starts):]
+
+    # Complete JSON followed by trailing prose
+    try:
+        return json.JSONDecoder().raw_decode(text)[0], True
+    except ValueError:
+        pass
+
+    candidates = [text]
+    _, _, commas = _scan(text)
+    candidates.extend(text[:pos] for pos in reversed(commas[-MAX_CUTBACKS:]))
+    for candidate in candidates:
+        try:
+            return json.loads(_close(candidate)), True
+        except ValueError:
+            continue
+    return None, True
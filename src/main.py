@@ -5,18 +5,123 @@ import time
 from datetime import datetime
 import json
 import base64
+import hashlib
 from dotenv import load_dotenv
 from jinja2 import Environment, FileSystemLoader
 
 # Import modules
 from feed_parser import collect_news
+from triage import RelevanceTriage
 from summarizer import NewsSummarizer
 from image_generator import ImageGenerator
+from image_cache import ImageLibrary
 from mailer import send_email
+from report_archive import ReportArchive
 
 # Load environment variables
 load_dotenv()
 
+def process_article(article, summarizer, image_gen, image_library):
+    """Summarize one article and attach its image. Returns the card dict, or None on failure."""
+    print(f"[-] Processing: {article['title']}")
+    
+    # A. Summarize
+    summary_data = summarizer.summarize(f"{article['title']}\n{article['summary']}", article['source'])
+    
+    if not summary_data:
+        print("   -> Failed to summarize. Skipping.")
+        return None
+        
+    # Add metadata
+    summary_data['source'] = article['source']
+    summary_data['original_link'] = article['link']
+    summary_data['published'] = article['published']
+    summary_data['matched_keywords'] = article.get('matched_keywords', [])
+    summary_data['triage_score'] = article.get('triage_score')
+    
+    # B. Generate Image
+    # If image prompt exists in summary, use it. Otherwise use title.
+    image_prompt = summary_data.get('image_prompt', summary_data['headline_kr'])
+    
+    # Create a local filename
+    # Library images persist across runs, so the name must be unique per image:
+    # same-prefix titles would otherwise overwrite an earlier library entry
+    safe_title = "".join(x for x in article['title'] if x.isalnum())[:20]
+    prompt_hash = hashlib.sha1(f"{image_prompt}|{time.time()}".encode("utf-8")).hexdigest()[:10]
+    image_path = f"images/{safe_title}_{prompt_hash}.png"
+    
+    # Ensure images dir exists
+    os.makedirs("images", exist_ok=True)
+    
+    # Reuses a library image when a similar prompt was generated before
+    generated_image = image_library.get_or_generate(image_prompt, image_path, image_gen)
+    
+    # For email, we might need a hosted URL or CID attachment.
+    # For serverless without storage, we have a challenge.
+    # Option 1: Base64 embed (increases email size, might be blocked).
+    # Option 2: Upload to temporary storage (GitHub Artifacts? Not accessible in email easily).
+    # Option 3: Use the NanoBanana URL directly if public?
+    # For this PoC, let's assume valid URL or use a placeholder if file based.
+    # If ImageGenerator returns a local path, we can't easily embed unless we use CID.
+    # Let's simplify: If Mock, return a Placeholder URL.
+    
+    if generated_image:
+         summary_data['image_path'] = generated_image
+         if generated_image.startswith("http"):
+             summary_data['image_url'] = generated_image
+         else:
+             # Convert local file to Base64 data URI for email embedding
+             try:
+                 with open(generated_image, 'rb') as img_file:
+                     img_data = base64.b64encode(img_file.read()).decode('utf-8')
+                     summary_data['image_url'] = f"data:image/png;base64,{img_data}"
+                     print(f"    [Image] Converted to Base64 ({len(img_data)} chars)")
+             except Exception as e:
+                 print(f"    [Image] Failed to encode: {e}")
+                 summary_data['image_url'] = "https://via.placeholder.com/600x300?text=Naval+Technology"
+    else:
+         summary_data['image_url'] = "https://via.placeholder.com/600x300?text=Naval+Technology"
+
+    return summary_data
+
+# Loaded once so incremental re-renders reuse the compiled template
+TEMPLATE_ENV = Environment(loader=FileSystemLoader('src/templates'))
+
+def _write_atomic(path, text):
+    """Write to a temp file and swap it in, so a watching dashboard never reads a partial file."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+def write_report(cards):
+    """Render the cards so far and atomically replace the report files. Returns the HTML."""
+    # 4. Generate HTML
+    template = TEMPLATE_ENV.get_template('email_template.html')
+    
+    date_str = datetime.now().strftime('%Y-%m-%d %H:%M')
+    html_output = template.render(cards=cards, date_str=date_str)
+    
+    # Save locally for debug / dashboard
+    _write_atomic("daily_report_debug.html", html_output)
+
+    # Save structured data for Dashboard
+    _write_atomic("daily_report.json", json.dumps(cards, ensure_ascii=False, indent=4))
+    print(f"[*] Report updated: {len(cards)} cards in daily_report.json")
+    return html_output
+
+def publish_report(cards, html_output=None):
+    """Archive the final set of cards and send the digest email (once per run)."""
+    if html_output is None:
+        html_output = write_report(cards)
+
+    # Append to the date-partitioned archive for history/trend queries
+    ReportArchive().append(cards)
+        
+    # 5. Send Email
+    subject = f"[NaviCard AI] {datetime.now().strftime('%Y-%m-%d')} Naval Tech Brief"
+    send_email(subject, html_output)
+
 def main():
     print("=== NaviCard AI System Started ===")
     
@@ -26,95 +131,45 @@ def main():
         print("[!] No news found. Exiting.")
         return
 
-    # 2. AI Processing (Summarize + Image)
+    # 2. Relevance Triage (cheap batched scoring before deep analysis)
+    triage = RelevanceTriage()
+    raw_articles = triage.filter(raw_articles)
+    if not raw_articles:
+        triage.report()
+        print("[!] No relevant news after triage. Exiting.")
+        return
+
+    # 3. AI Processing (Summarize + Image)
     summarizer = NewsSummarizer()
     image_gen = ImageGenerator()
+    image_library = ImageLibrary()
     
     cards = []
+    html_output = None
     
     # Process max 5 articles to save time/cost during dev/test
     # In production, maybe limit to top 10 relevant ones
     for article in raw_articles[:5]: 
-        print(f"[-] Processing: {article['title']}")
-        
-        # A. Summarize
-        summary_data = summarizer.summarize(f"{article['title']}\n{article['summary']}", article['source'])
-        
-        if not summary_data:
-            print("   -> Failed to summarize. Skipping.")
+        card = process_article(article, summarizer, image_gen, image_library)
+        if not card:
             continue
-            
-        # Add metadata
-        summary_data['source'] = article['source']
-        summary_data['original_link'] = article['link']
-        
-        # B. Generate Image
-        # If image prompt exists in summary, use it. Otherwise use title.
-        image_prompt = summary_data.get('image_prompt', summary_data['headline_kr'])
-        
-        # Create a local filename
-        safe_title = "".join(x for x in article['title'] if x.isalnum())[:20]
-        image_path = f"images/{safe_title}.png"
-        
-        # Ensure images dir exists
-        os.makedirs("images", exist_ok=True)
-        
-        generated_image = image_gen.generate_image(image_prompt, image_path)
-        
-        # For email, we might need a hosted URL or CID attachment.
-        # For serverless without storage, we have a challenge.
-        # Option 1: Base64 embed (increases email size, might be blocked).
-        # Option 2: Upload to temporary storage (GitHub Artifacts? Not accessible in email easily).
-        # Option 3: Use the NanoBanana URL directly if public?
-        # For this PoC, let's assume valid URL or use a placeholder if file based.
-        # If ImageGenerator returns a local path, we can't easily embed unless we use CID.
-        # Let's simplify: If Mock, return a Placeholder URL.
-        
-        if generated_image:
-             if generated_image.startswith("http"):
-                 summary_data['image_url'] = generated_image
-             else:
-                 # Convert local file to Base64 data URI for email embedding
-                 try:
-                     with open(generated_image, 'rb') as img_file:
-                         img_data = base64.b64encode(img_file.read()).decode('utf-8')
-                         summary_data['image_url'] = f"data:image/png;base64,{img_data}"
-                         print(f"    [Image] Converted to Base64 ({len(img_data)} chars)")
-                 except Exception as e:
-                     print(f"    [Image] Failed to encode: {e}")
-                     summary_data['image_url'] = "https://via.placeholder.com/600x300?text=Naval+Technology"
-        else:
-             summary_data['image_url'] = "https://via.placeholder.com/600x300?text=Naval+Technology"
-
-        cards.append(summary_data)
+
+        cards.append(card)
+        # Publish each card as soon as it is ready; the email still goes out once at the end
+        html_output = write_report(cards)
         
         print("    [Rate Limit] Sleeping 10s...")
         time.sleep(10)
 
+    triage.report()
+    summarizer.report()
+    image_library.report()
+
     if not cards:
         print("[!] No cards generated. Exiting.")
         return
 
-    # 3. Generate HTML
-    env = Environment(loader=FileSystemLoader('src/templates'))
-    template = env.get_template('email_template.html')
-    
-    date_str = datetime.now().strftime('%Y-%m-%d %H:%M')
-    html_output = template.render(cards=cards, date_str=date_str)
-    
-    # Save locally for debug
-    with open("daily_report_debug.html", "w", encoding="utf-8") as f:
-        f.write(html_output)
-
-    # Save structured data for Dashboard
-    print(f"[*] Saving {len(cards)} cards to daily_report.json...")
-    with open("daily_report.json", "w", encoding="utf-8") as f:
-        json.dump(cards, f, ensure_ascii=False, indent=4)
-    print("[*] JSON saved.")
-        
-    # 4. Send Email
-    subject = f"[NaviCard AI] {datetime.now().strftime('%Y-%m-%d')} Naval Tech Brief"
-    send_email(subject, html_output)
+    publish_report(cards, html_output)
 
     print("=== NaviCard AI System Finished ===")
 
@@ -0,0 +1,198 @@
+
+import os
+import json
+import gzip
+from datetime import datetime, date
+
+from feed_parser import PLATFORM_KEYWORDS
+
+# Configuration
+ARCHIVE_DIR = os.getenv("REPORT_ARCHIVE_DIR", "archive")
+INDEX_FILE = "index.json"
+
+def _write_json_atomic(path, data):
+    """Write JSON to a temp file and swap it in, so readers never see a half-written file."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+def _bump(counter, key, amount=1):
+    counter[key] = counter.get(key, 0) + amount
+
+def _week_key(day):
+    """ISO week label for a date, e.g. '2026-W42'."""
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
+
+def _compact_card(card):
+    """Drop bulky fields (Base64 image data) before a card goes into the archive."""
+    compact = dict(card)
+    if str(compact.get('image_url', '')).startswith("data:"):
+        compact.pop('image_url')
+    return compact
+
+class ReportArchive:
+    """
+    Append-only, date-partitioned archive of generated cards.
+
+    Layout:
+        archive/2026/2026-10-19.jsonl.gz   one gzip member appended per run
+        archive/index.json                 per-day and per-week aggregates
+
+    The index is updated incrementally on every append, so counts and trends
+    are answered from it directly without opening any day file.
+    """
+
+    def __init__(self, root=ARCHIVE_DIR):
+        self.root = root
+        self.index_path = os.path.join(root, INDEX_FILE)
+        self.index = self._load_index()
+
+    def _load_index(self):
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        return {"days": {}, "weeks": {}}
+
+    def _day_path(self, day_str):
+        return os.path.join(self.root, day_str[:4], f"{day_str}.jsonl.gz")
+
+    def append(self, cards, run_date=None):
+        """
+        Append a run's cards to the day partition and update the index.
+
+        Args:
+            cards (list): Card dicts as produced by main.main.
+            run_date (date): Partition date. Defaults to today.
+
+        Returns:
+            str: Path of the day file written to, or None if nothing was appended.
+        """
+        if not cards:
+            return None
+
+        run_date = run_date or date.today()
+        day_str = run_date.isoformat()
+        day_path = self._day_path(day_str)
+        os.makedirs(os.path.dirname(day_path), exist_ok=True)
+
+        archived_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        lines = []
+        for card in cards:
+            record = _compact_card(card)
+            record['archived_at'] = archived_at
+            lines.append(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+
+        # Appending a new gzip member keeps earlier runs untouched; gzip readers
+        # decode concatenated members as one stream.
+        with gzip.open(day_path, "at", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+        day_entry = self.index["days"].setdefault(day_str, {"cards": 0, "sources": {}, "keywords": {}})
+        week_entry = self.index["weeks"].setdefault(_week_key(run_date), {"cards": 0, "sources": {}, "keywords": {}, "platforms": {}})
+
+        for card in cards:
+            source = card.get('source', 'Unknown Source')
+            keywords = card.get('matched_keywords', [])
+
+            for entry in (day_entry, week_entry):
+                entry["cards"] += 1
+                _bump(entry["sources"], source)
+                for kw in keywords:
+                    _bump(entry["keywords"], kw)
+
+            for kw in keywords:
+                if kw in PLATFORM_KEYWORDS:
+                    _bump(week_entry["platforms"], kw)
+
+        _write_json_atomic(self.index_path, self.index)
+        print(f"[Archive] Appended {len(cards)} cards to {day_path}")
+        return day_path
+
+    def _matching_days(self, start=None, end=None, source=None, keyword=None):
+        """Days (ascending) whose index entry satisfies the filters."""
+        days = []
+        for day_str, entry in self.index["days"].items():
+            if start and day_str < str(start):
+                continue
+            if end and day_str > str(end):
+                continue
+            if source and source not in entry["sources"]:
+                continue
+            if keyword and keyword not in entry["keywords"]:
+                continue
+            days.append(day_str)
+        return sorted(days)
+
+    def daily_counts(self, start=None, end=None, source=None, keyword=None):
+        """
+        Card counts per day, answered from the index only.
+
+        Returns:
+            dict: {'YYYY-MM-DD': count}. With a source or keyword filter the count
+            is the number of cards for that source / mentions of that keyword.
+
+        Raises:
+            ValueError: If both source and keyword are given. The index keeps
+            per-source and per-keyword totals only, not their intersection;
+            use query() and count the cards instead.
+        """
+        if source and keyword:
+            raise ValueError("daily_counts takes source or keyword, not both; use query() for the intersection")
+        counts = {}
+        for day_str in self._matching_days(start, end, source, keyword):
+            entry = self.index["days"][day_str]
+            if source:
+                counts[day_str] = entry["sources"][source]
+            elif keyword:
+                counts[day_str] = entry["keywords"][keyword]
+            else:
+                counts[day_str] = entry["cards"]
+        return counts
+
+    def weekly_trends(self, start=None, end=None):
+        """
+        Weekly keyword/platform mention counts and source volume.
+
+        Args:
+            start, end (date): Optional bounds; weeks are matched by their ISO label.
+
+        Returns:
+            dict: {'YYYY-Www': {'cards', 'sources', 'keywords', 'platforms'}}
+        """
+        start_week = _week_key(start) if start else None
+        end_week = _week_key(end) if end else None
+        return {
+            week: entry for week, entry in sorted(self.index["weeks"].items())
+            if (not start_week or week >= start_week) and (not end_week or week <= end_week)
+        }
+
+    def query(self, start=None, end=None, source=None, keyword=None):
+        """
+        Load archived cards. The index narrows the scan to matching days first,
+        then individual cards are filtered by source and keyword.
+        """
+        results = []
+        for day_str in self._matching_days(start, end, source, keyword):
+            day_path = self._day_path(day_str)
+            if not os.path.exists(day_path):
+                continue
+            with gzip.open(day_path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    card = json.loads(line)
+                    if source and card.get('source') != source:
+                        continue
+                    if keyword and keyword not in card.get('matched_keywords', []):
+                        continue
+                    results.append(card)
+        return results
+
+if __name__ == "__main__":
+    archive = ReportArchive()
+    print(f"[*] {len(archive.index['days'])} archived days")
+    for week, entry in archive.weekly_trends().items():
+        top = sorted(entry["keywords"].items(), key=lambda kv: -kv[1])[:5]
+        print(f"{week}: {entry['cards']} cards | top keywords: {top}")
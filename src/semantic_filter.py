@@ -0,0 +1,181 @@
+
+import os
+
+try:
+    import numpy as np
+except ImportError:  # numpy missing: collect_news falls back to keywords only
+    np = None
+
+# Configuration
+# Weight of the semantic score vs. the keyword filter (0 = keywords only, 1 = semantic only)
+SEMANTIC_BLEND = float(os.getenv("SEMANTIC_BLEND", "0.5"))
+# Topic-minus-anti-topic cosine margin that counts as a full semantic match
+SEMANTIC_REFERENCE = float(os.getenv("SEMANTIC_REFERENCE", "0.3"))
+# Articles with a blended score at or above this are kept. With the default
+# blend, a keyword match alone passes (0.5) and an article without keywords
+# needs a semantic score of 0.8
+BLEND_THRESHOLD = float(os.getenv("SEMANTIC_THRESHOLD", "0.4"))
+
+HASH_BITS = 12
+HASH_DIM = 1 << HASH_BITS
+MAX_CHARS = 600
+ROW_BLOCK = 512
+
+# Seed descriptions per topic; each group becomes one centroid
+TOPIC_SEEDS = {
+    "ship_control": [
+        "ship control system steering autopilot dynamic positioning bridge system integrated bridge",
+        "함정 제어 시스템 조타 자동항법 통합 브리지 시스템",
+    ],
+    "autonomy": [
+        "unmanned surface vessel USV autonomous navigation uncrewed vessel remote operation autonomy",
+        "무인수상정 무인 함정 자율운항 원격 운용 자율화",
+    ],
+    "platform": [
+        "integrated platform management system IPMS machinery control monitoring automation platform automation suite damage control",
+        "통합 플랫폼 관리 시스템 기관 제어 감시 자동화 손상통제",
+    ],
+    "propulsion": [
+        "propulsion engine gas turbine diesel electric hybrid propulsion power generation shaft propeller",
+        "추진 체계 엔진 가스터빈 디젤 전기 추진 하이브리드 발전",
+    ],
+    "c2_digital": [
+        "command and control combat management digital twin smart ship simulation modeling",
+        "지휘통제 전투체계 디지털 트윈 스마트 함정 모델링 시뮬레이션",
+    ],
+}
+
+ANTI_TOPIC_SEEDS = {
+    "weapons": [
+        "missile torpedo ammunition gun rifle warhead munitions strike test fire",
+        "미사일 어뢰 탄약 함포 탄두 사격 시험",
+    ],
+    "aviation": [
+        "aircraft strike fighter jet helicopter squadron carrier air wing pilot",
+        "항공기 전투기 헬기 비행대대 조종사",
+    ],
+    "personnel_politics": [
+        "sailor personnel promotion court martial budget hearing congress lawmakers election",
+        "장병 인사 예산 국회 청문회 선거",
+    ],
+}
+
+# ASCII letters/digits keep their code point, other ASCII becomes a space;
+# non-ASCII (Hangul etc.) is kept as is
+_ASCII_MAP = np.array([c if chr(c).isalnum() else 32 for c in range(128)], dtype=np.uint32) if np is not None else None
+# log1p lookup for term counts (sublinear TF); counts beyond the table are capped
+_SUBLINEAR = np.log1p(np.arange(64, dtype=np.float32)) if np is not None else None
+
+def _hashed_terms(texts):
+    """
+    Hashed character-trigram term frequencies, one sparse block at a time.
+
+    Cleanup, hashing and counting run as NumPy array ops over ROW_BLOCK texts
+    at once. Character n-grams make inflections ("automation"/"automated") and
+    Hangul text land near each other.
+
+    Yields:
+        tuple: (block_start, doc_index, hash_index, tf) with entries sorted by
+        document; tf is sublinear (log1p of the count).
+    """
+    for start in range(0, len(texts), ROW_BLOCK):
+        block = texts[start:start + ROW_BLOCK]
+        pieces = [" " + (t or "")[:MAX_CHARS].lower() + " " for t in block]
+        raw = np.frombuffer("\x00".join(pieces).encode("utf-32-le"), dtype=np.uint32)
+        if raw.size < 3:
+            continue
+        doc_ids = np.repeat(np.arange(len(pieces)), [len(p) + 1 for p in pieces])[:raw.size]
+        codes = np.where(raw < 128, _ASCII_MAP[np.minimum(raw, 127)], raw)
+
+        a, b, c = codes[:-2], codes[1:-1], codes[2:]
+        # Drop trigrams crossing a document boundary or made of punctuation runs
+        valid = (doc_ids[:-2] == doc_ids[2:]) & ~((a == 32) & (b == 32)) & ~((b == 32) & (c == 32))
+        # uint32 multiplies wrap around, which is what the hash wants
+        hashes = ((a * np.uint32(0x9E3779B1)) ^ (b * np.uint32(0x85EBCA77)) ^ (c * np.uint32(0xC2B2AE3D))) >> np.uint32(32 - HASH_BITS)
+
+        # Sorting the (doc, hash) keys counts duplicates without a dense n x HASH_DIM array
+        keys = np.sort(doc_ids[:-2][valid] * HASH_DIM + hashes[valid])
+        if keys.size == 0:
+            continue
+        firsts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        counts = np.diff(np.r_[firsts, keys.size])
+        keys = keys[firsts]
+        tf = _SUBLINEAR[np.minimum(counts, _SUBLINEAR.size - 1)]
+        yield start, keys // HASH_DIM, keys % HASH_DIM, tf
+
+def vectorize(texts):
+    """Dense hashed trigram TF vectors (L2-normalized), shape (n, HASH_DIM)."""
+    matrix = np.zeros((len(texts), HASH_DIM), dtype=np.float32)
+    for start, docs, hashes, tf in _hashed_terms(texts):
+        matrix[start + docs, hashes] = tf
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+def _sparse_similarity(texts, centroids):
+    """
+    Cosine similarity of every text against every centroid, shape (n, k).
+
+    Equivalent to vectorize(texts) @ centroids.T, but only the non-zero terms
+    are touched: their centroid weights are gathered and summed per document.
+    """
+    centroids_t = centroids.T
+    sims = np.zeros((len(texts), centroids.shape[0]), dtype=np.float32)
+    for start, docs, hashes, tf in _hashed_terms(texts):
+        if docs.size == 0:
+            continue
+        # Entries are sorted by document, so each document is one contiguous run
+        run_starts = np.flatnonzero(np.r_[True, docs[1:] != docs[:-1]])
+        rows = start + docs[run_starts]
+        dots = np.add.reduceat(tf[:, None] * centroids_t[hashes], run_starts, axis=0)
+        norms = np.sqrt(np.add.reduceat(tf * tf, run_starts))
+        sims[rows] = dots / norms[:, None]
+    return sims
+
+def _centroids(seed_groups):
+    rows = []
+    for seeds in seed_groups.values():
+        centroid = vectorize(seeds).mean(axis=0)
+        rows.append(centroid / np.linalg.norm(centroid))
+    return np.vstack(rows)
+
+class SemanticFilter:
+    """
+    Offline relevance scorer: cosine similarity of hashed trigram vectors
+    against precomputed topic and anti-topic centroids.
+
+    The centroid matrix is built once per process; scoring a batch is the
+    (n x HASH_DIM) @ (HASH_DIM x k) product, computed over non-zero terms only.
+    """
+
+    def __init__(self, topic_seeds=TOPIC_SEEDS, anti_topic_seeds=ANTI_TOPIC_SEEDS):
+        self.topic_count = len(topic_seeds)
+        self.centroids = _centroids({**topic_seeds, **{f"anti_{k}": v for k, v in anti_topic_seeds.items()}})
+
+    def score(self, texts):
+        """
+        Returns:
+            numpy.ndarray: Semantic relevance in [0, 1] per text: the margin of the best
+            topic over the best anti-topic similarity, scaled by SEMANTIC_REFERENCE.
+        """
+        if not texts:
+            return np.zeros(0, dtype=np.float32)
+        sims = _sparse_similarity(texts, self.centroids)
+        margin = sims[:, :self.topic_count].max(axis=1) - sims[:, self.topic_count:].max(axis=1)
+        return np.clip(margin / SEMANTIC_REFERENCE, 0.0, 1.0)
+
+_default_filter = None
+
+def get_semantic_filter():
+    """Shared SemanticFilter, or None when numpy is unavailable or the blend is 0."""
+    global _default_filter
+    if np is None or SEMANTIC_BLEND <= 0:
+        return None
+    if _default_filter is None:
+        _default_filter = SemanticFilter()
+    return _default_filter
+
+def blend_scores(keyword_pass, semantic_scores, blend=SEMANTIC_BLEND):
+    """Blend keyword pass/fail (1/0) with semantic scores. Returns the combined scores."""
+    keyword = np.asarray(keyword_pass, dtype=np.float32)
+    return (1.0 - blend) * keyword + blend * semantic_scores
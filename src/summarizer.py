@@ -1,10 +1,72 @@
 
 import os
 import google.generativeai as genai
-import json
 import time
 import requests
 
+from json_repair import repair_json
+
+# Declared output schema (Gemini responseSchema, OpenAPI subset)
+SUMMARY_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "headline_kr": {"type": "STRING"},
+        "deep_summary_kr": {"type": "STRING"},
+        "technical_specs_kr": {"type": "ARRAY", "items": {"type": "STRING"}},
+        "strategic_insight_kr": {"type": "STRING"},
+        "image_prompt": {"type": "STRING"},
+    },
+    "required": ["headline_kr", "deep_summary_kr", "technical_specs_kr", "strategic_insight_kr", "image_prompt"],
+    "propertyOrdering": ["headline_kr", "deep_summary_kr", "technical_specs_kr", "strategic_insight_kr", "image_prompt"],
+}
+
+TEXT_FIELDS = ["headline_kr", "deep_summary_kr", "strategic_insight_kr", "image_prompt"]
+
+def _as_text(value):
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return "\n".join(_as_text(v) for v in value)
+    if isinstance(value, dict):
+        return "\n".join(f"{k}: {_as_text(v)}" for k, v in value.items())
+    return str(value).strip()
+
+def _as_list(value):
+    if value is None:
+        return []
+    if isinstance(value, dict):
+        return [f"{k}: {_as_text(v)}" for k, v in value.items()]
+    if isinstance(value, list):
+        return [item for item in (_as_text(v) for v in value) if item]
+    lines = (line.strip().lstrip("-*•").strip() for line in str(value).splitlines())
+    return [line for line in lines if line]
+
+def normalize_summary(parsed):
+    """
+    Coerce a parsed model response into the card shape.
+
+    technical_specs_kr always becomes a list of strings, text fields become
+    strings, and a missing image_prompt falls back to the headline.
+
+    Returns:
+        dict: Normalized summary, or None if headline/summary are missing.
+    """
+    if isinstance(parsed, list):
+        parsed = next((item for item in parsed if isinstance(item, dict)), None)
+    if not isinstance(parsed, dict):
+        return None
+
+    summary = dict(parsed)
+    for field in TEXT_FIELDS:
+        summary[field] = _as_text(parsed.get(field))
+    summary['technical_specs_kr'] = _as_list(parsed.get('technical_specs_kr'))
+
+    if not summary['headline_kr'] or not summary['deep_summary_kr']:
+        return None
+    if not summary['image_prompt']:
+        summary['image_prompt'] = summary['headline_kr']
+    return summary
+
 class NewsSummarizer:
     def __init__(self):
         self.api_key = os.getenv("GEMINI_API_KEY")
@@ -12,6 +74,9 @@ class NewsSummarizer:
             print("[Summarizer] Warning: GEMINI_API_KEY not found.")
         # User requested gemini-3-flash-preview for deep insights
         self.model_name = "gemini-3-flash-preview"
+        # Keep-alive session so repeated calls reuse the TLS connection
+        self.session = requests.Session()
+        self.new_run()
 
     def summarize(self, article_text, source_name):
         """
@@ -53,14 +118,17 @@ class NewsSummarizer:
                 "parts": [{"text": prompt_text}]
             }],
             "generationConfig": {
-                "response_mime_type": "application/json"
+                "response_mime_type": "application/json",
+                "response_schema": SUMMARY_SCHEMA
             }
         }
 
         for attempt in range(3):
             try:
                 print(f"[*] Asking Gemini ({self.model_name}) to summarize via REST (Attempt {attempt+1})...")
-                response = requests.post(url, headers=headers, json=data)
+                start = time.perf_counter()
+                response = self.session.post(url, headers=headers, json=data)
+                self.stats["seconds"] += time.perf_counter() - start
                 
                 if response.status_code == 429:
                     print(f"[Summarizer] Rate limit hit. Waiting 60 seconds...")
@@ -71,27 +139,51 @@ class NewsSummarizer:
                     print(f"[Summarizer] API Error: {response.status_code} - {response.text}")
                     return None
                     
+                self.stats["calls"] += 1
                 result_json = response.json()
+                usage = result_json.get('usageMetadata', {})
+                self.stats["prompt_tokens"] += usage.get('promptTokenCount', 0)
+                self.stats["output_tokens"] += usage.get('candidatesTokenCount', 0)
                 # Parse response structure
                 try:
                     text_content = result_json['candidates'][0]['content']['parts'][0]['text']
-                    parsed = json.loads(text_content)
-                    if isinstance(parsed, list):
-                        if len(parsed) > 0:
-                            return parsed[0]
-                        else:
-                            return None # Empty list
-                    return parsed
-                except (KeyError, IndexError, json.JSONDecodeError) as e:
+                except (KeyError, IndexError) as e:
                     print(f"[Summarizer] Failed to parse API response: {e}")
                     print(f"[Summarizer] Raw response: {result_json}")
-                    return None
+                    text_content = None
+
+                # Repair locally first; a fresh call is the last resort
+                parsed, repaired = repair_json(text_content)
+                summary = normalize_summary(parsed)
+                if summary:
+                    if repaired:
+                        self.stats["repaired"] += 1
+                        print("[Summarizer] Repaired malformed JSON locally.")
+                    return summary
+
+                self.stats["wasted"] += 1
+                print(f"[Summarizer] Unusable response, retrying. Raw text: {str(text_content)[:300]}")
+                continue
 
             except Exception as e:
                 print(f"[Summarizer] Error generating summary: {e}")
                 return None
         return None
 
+    def new_run(self):
+        """Reset statistics, e.g. after a daemon digest."""
+        # "calls" counts answered (paid) requests; "wasted" those whose output was discarded
+        self.stats = {"calls": 0, "repaired": 0, "wasted": 0, "seconds": 0.0, "prompt_tokens": 0, "output_tokens": 0}
+
+    def report(self):
+        """Print deep-analysis tier cost/latency and the wasted-call rate for this run."""
+        calls = self.stats["calls"]
+        wasted_rate = (self.stats["wasted"] / calls * 100) if calls else 0.0
+        print(f"[Summarizer] {calls} calls, {self.stats['repaired']} repaired locally, "
+              f"{self.stats['wasted']} wasted ({wasted_rate:.0f}% wasted-call rate) | "
+              f"{self.stats['seconds']:.1f}s, {self.stats['prompt_tokens']} in / {self.stats['output_tokens']} out tokens")
+        return dict(self.stats, wasted_rate=wasted_rate)
+
 if __name__ == "__main__":
     # Test stub
     summ = NewsSummarizer()
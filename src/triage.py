@@ -0,0 +1,163 @@
+
+import os
+import time
+import requests
+
+from json_repair import repair_json
+
+# Configuration
+TRIAGE_MODEL = os.getenv("TRIAGE_MODEL", "gemini-2.5-flash-lite")
+TRIAGE_THRESHOLD = float(os.getenv("TRIAGE_THRESHOLD", "0.5"))
+TRIAGE_BATCH_SIZE = int(os.getenv("TRIAGE_BATCH_SIZE", "25"))
+# Set TRIAGE_ENABLED=false to promote every keyword match straight to the summarizer
+TRIAGE_ENABLED = os.getenv("TRIAGE_ENABLED", "true").lower() != "false"
+
+TRIAGE_SCHEMA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {
+            "id": {"type": "INTEGER"},
+            "score": {"type": "NUMBER"},
+        },
+        "required": ["id", "score"],
+    },
+}
+
+class RelevanceTriage:
+    """
+    Cheap first tier of the model cascade.
+
+    Keyword matches are scored for relevance in batches, one request to a small
+    model per batch, and only articles scoring at least the threshold are
+    promoted to NewsSummarizer/ImageGenerator. If a batch cannot be scored
+    (no key, API error, unparseable reply) its articles pass through unscored
+    so the keyword filter remains the floor.
+    """
+
+    def __init__(self, model_name=TRIAGE_MODEL, threshold=TRIAGE_THRESHOLD, batch_size=TRIAGE_BATCH_SIZE, enabled=TRIAGE_ENABLED):
+        self.api_key = os.getenv("GEMINI_API_KEY")
+        self.model_name = model_name
+        self.threshold = threshold
+        self.batch_size = batch_size
+        self.enabled = enabled
+        self.session = requests.Session()
+        self.new_run()
+
+    def _build_prompt(self, batch):
+        lines = []
+        for i, article in enumerate(batch):
+            lines.append(f"[{i}] {article['title']} :: {article['summary'][:400]}")
+        items = "\n".join(lines)
+        return f"""
+        You screen naval defense news for an expert in Ship Control Systems, Autonomous Vessels (USV),
+        Integrated Platform Management, Propulsion and naval M&S.
+
+        Score each item from 0.0 to 1.0 for how much it is about ship control, autonomy/USV,
+        platform management, propulsion or ship systems engineering.
+        Items that only mention a ship type (frigate, destroyer, submarine) in passing, or are about
+        weapons, procurement politics, personnel or operations news, score low.
+
+        **Items**:
+        {items}
+
+        Return ONLY a JSON array of objects with "id" (the number in brackets) and "score".
+        """
+
+    def _score_batch(self, batch):
+        """Return {index: score} for a batch, or None if it could not be scored."""
+        url = f"https://generativelanguage.googleapis.com/v1beta/models/{self.model_name}:generateContent?key={self.api_key}"
+        headers = {'Content-Type': 'application/json'}
+        data = {
+            "contents": [{"parts": [{"text": self._build_prompt(batch)}]}],
+            "generationConfig": {
+                "response_mime_type": "application/json",
+                "response_schema": TRIAGE_SCHEMA
+            }
+        }
+
+        start = time.perf_counter()
+        try:
+            response = self.session.post(url, headers=headers, json=data, timeout=60)
+        except Exception as e:
+            print(f"[Triage] Error scoring batch: {e}")
+            return None
+        finally:
+            self.stats["seconds"] += time.perf_counter() - start
+
+        if response.status_code != 200:
+            print(f"[Triage] API Error: {response.status_code} - {response.text[:200]}")
+            return None
+
+        self.stats["requests"] += 1
+        try:
+            result_json = response.json()
+        except ValueError as e:
+            print(f"[Triage] Invalid JSON response body: {e}")
+            return None
+        usage = result_json.get('usageMetadata', {})
+        self.stats["prompt_tokens"] += usage.get('promptTokenCount', 0)
+        self.stats["output_tokens"] += usage.get('candidatesTokenCount', 0)
+
+        try:
+            text_content = result_json['candidates'][0]['content']['parts'][0]['text']
+        except (KeyError, IndexError) as e:
+            print(f"[Triage] Failed to parse API response: {e}")
+            return None
+
+        parsed, _ = repair_json(text_content)
+        if not isinstance(parsed, list):
+            return None
+        scores = {}
+        for item in parsed:
+            try:
+                scores[int(item['id'])] = float(item['score'])
+            except (KeyError, TypeError, ValueError):
+                continue
+        return scores
+
+    def filter(self, articles):
+        """
+        Score articles and return those passing the threshold, most relevant first.
+        Each returned article carries a 'triage_score' (None if unscored).
+        """
+        if not self.enabled or not articles:
+            return articles
+        if not self.api_key:
+            print("[Triage] No API Key found. Passing all articles through.")
+            return articles
+
+        print(f"[Triage] Scoring {len(articles)} candidates with {self.model_name}...")
+        promoted = []
+        for i in range(0, len(articles), self.batch_size):
+            batch = articles[i:i + self.batch_size]
+            scores = self._score_batch(batch)
+            for j, article in enumerate(batch):
+                score = scores.get(j) if scores else None
+                article['triage_score'] = score
+                if score is None:
+                    self.stats["unscored"] += 1
+                    promoted.append(article)
+                    continue
+                self.stats["scored"] += 1
+                if score >= self.threshold:
+                    promoted.append(article)
+                else:
+                    print(f"  [-] Triage drop ({score:.2f}): {article['title']}")
+
+        self.stats["passed"] += len(promoted)
+        # Unscored articles sort after scored ones, keeping keyword order among themselves
+        promoted.sort(key=lambda a: -(a['triage_score'] if a['triage_score'] is not None else -1))
+        print(f"[Triage] {len(promoted)}/{len(articles)} promoted to deep analysis")
+        return promoted
+
+    def new_run(self):
+        """Reset statistics, e.g. after a daemon digest."""
+        self.stats = {"requests": 0, "scored": 0, "passed": 0, "unscored": 0, "seconds": 0.0, "prompt_tokens": 0, "output_tokens": 0}
+
+    def report(self):
+        """Print triage tier cost/latency for this run."""
+        print(f"[Triage] {self.stats['requests']} requests, {self.stats['scored']} scored, "
+              f"{self.stats['passed']} promoted, {self.stats['unscored']} unscored | "
+              f"{self.stats['seconds']:.1f}s, {self.stats['prompt_tokens']} in / {self.stats['output_tokens']} out tokens")
+        return dict(self.stats)
@@ -0,0 +1,54 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from image_cache import ImageLibrary, prompt_signature, similarity
+
+class FakeImageGenerator:
+    """Writes an empty file instead of calling the image API."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def generate_image(self, prompt, output_path):
+        self.calls += 1
+        with open(output_path, "wb") as f:
+            f.write(b"")
+        return output_path
+
+def test_frigate_image_not_reused_for_submarine():
+    frigate = "Cinematic shot of a modern frigate at sea"
+    submarine = "Cinematic shot of a modern submarine at sea"
+    assert similarity(prompt_signature(frigate), prompt_signature(submarine)) == 0.0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        library = ImageLibrary(path=os.path.join(tmp, "library.json"), mode="reuse")
+        image_gen = FakeImageGenerator()
+        library.get_or_generate(frigate, os.path.join(tmp, "frigate.png"), image_gen)
+        library.new_run()
+
+        path = library.get_or_generate(submarine, os.path.join(tmp, "submarine.png"), image_gen)
+        assert path == os.path.join(tmp, "submarine.png")
+        assert image_gen.calls == 2
+
+class FailingImageGenerator:
+    def generate_image(self, prompt, output_path):
+        return None
+
+def test_failed_generation_skips_unrelated_fallback():
+    with tempfile.TemporaryDirectory() as tmp:
+        library = ImageLibrary(path=os.path.join(tmp, "library.json"), mode="reuse")
+        library.get_or_generate("Frigate sailing through a storm near the coast", os.path.join(tmp, "storm.png"), FakeImageGenerator())
+        library.new_run()
+
+        # Same platform, but shares nothing else with the stored prompt
+        path = library.get_or_generate("Frigate moored at port", os.path.join(tmp, "port.png"), FailingImageGenerator())
+        assert path is None
+        assert library.stats["fallbacks"] == 0
+
+if __name__ == "__main__":
+    test_frigate_image_not_reused_for_submarine()
+    test_failed_generation_skips_unrelated_fallback()
+    print("OK")